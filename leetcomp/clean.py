@@ -1,11 +1,23 @@
-import json
+import mmap
 import sys
 from pathlib import Path
 
+import orjson
+
 try:
-    from .utils import config
+    from .utils import config, read_jsonl_lines
 except ImportError:
-    from utils import config
+    from utils import config, read_jsonl_lines
+
+
+def _file_mentions_any_id(file_path: str, post_ids: set[int]) -> bool:
+    """Cheap mmap scan for any of the id digits; false positives are fine."""
+    if Path(file_path).stat().st_size == 0:
+        return False
+
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return any(mm.find(str(post_id).encode()) != -1 for post_id in post_ids)
 
 
 def remove_posts_from_jsonl(file_path: str, post_ids: set[int]) -> int:
@@ -14,24 +26,38 @@ def remove_posts_from_jsonl(file_path: str, post_ids: set[int]) -> int:
         print(f"File {file_path} does not exist")
         return 0
 
+    # Int hashing is far cheaper than string hashing in the per-line loop
+    post_ids = {int(post_id) for post_id in post_ids}
+
+    # Skip the full rewrite when none of the ids can possibly be present
+    if not _file_mentions_any_id(file_path, post_ids):
+        return 0
     removed_count = 0
     temp_file = file_path + ".tmp"
+    flush_every = 10_000
 
-    with open(file_path) as infile, open(temp_file, "w") as outfile:
-        for line in infile:
+    with open(temp_file, "wb") as outfile:
+        kept_lines: list[bytes] = []
+        for line in read_jsonl_lines(file_path):
             if not line.strip():
                 continue
 
             try:
-                record = json.loads(line)
+                record = orjson.loads(line)
                 if record.get("id") not in post_ids:
-                    outfile.write(line)
+                    kept_lines.append(line + b"\n")
                 else:
                     removed_count += 1
                     print(f"Removed post ID: {record.get('id')}")
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 # Keep malformed lines as-is
-                outfile.write(line)
+                kept_lines.append(line + b"\n")
+
+            if len(kept_lines) >= flush_every:
+                outfile.writelines(kept_lines)
+                kept_lines.clear()
+
+        outfile.writelines(kept_lines)
 
     # Replace original file with cleaned version
     Path(temp_file).rename(file_path)
@@ -44,21 +70,36 @@ def remove_posts_from_json(file_path: str, post_ids: set[int]) -> int:
         print(f"File {file_path} does not exist")
         return 0
 
-    with open(file_path) as f:
-        records = json.load(f)
+    post_ids = {int(post_id) for post_id in post_ids}
+
+    with open(file_path, "rb") as f:
+        records = orjson.loads(f.read())
 
-    original_count = len(records)
-    filtered_records = [
-        record for record in records if record.get("id") not in post_ids
-    ]
-    removed_count = original_count - len(filtered_records)
+    removed_count = 0
+    present_ids = set()
+    temp_file = file_path + ".tmp"
 
-    with open(file_path, "w") as f:
-        json.dump(filtered_records, f, indent=4)
+    # Stream survivors straight to a temp file instead of building a second
+    # list and one big serialized buffer
+    with open(temp_file, "w") as f:
+        f.write("[\n")
+        first = True
+        for record in records:
+            record_id = record.get("id")
+            if record_id in post_ids:
+                removed_count += 1
+                present_ids.add(record_id)
+                continue
+            if not first:
+                f.write(",\n")
+            f.write(orjson.dumps(record, option=orjson.OPT_INDENT_2).decode())
+            first = False
+        f.write("\n]")
+
+    Path(temp_file).rename(file_path)
 
-    for post_id in post_ids:
-        if any(record.get("id") == post_id for record in records):
-            print(f"Removed post ID: {post_id}")
+    for post_id in present_ids:
+        print(f"Removed post ID: {post_id}")
 
     return removed_count
 
@@ -1,14 +1,21 @@
 try:
-    from .parse import parse_posts
-    from .refresh import refresh_posts
-    from .utils import config, truncate_raw_posts
+    from .utils import config
 except ImportError:
-    from parse import parse_posts
-    from refresh import refresh_posts
-    from utils import config, truncate_raw_posts
+    from utils import config
 
 
 def main():
+    # Defer the pipeline imports so their gql/openai cost is only paid when
+    # the pipeline actually runs
+    try:
+        from .parse import parse_posts
+        from .refresh import refresh_posts
+        from .utils import truncate_raw_posts
+    except ImportError:
+        from parse import parse_posts
+        from refresh import refresh_posts
+        from utils import truncate_raw_posts
+
     data_dir = config["app"]["data_dir"]
     raw_file = data_dir / "raw_comps.jsonl"
     parsed_file = data_dir / "parsed_comps.jsonl"
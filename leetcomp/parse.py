@@ -1,85 +1,209 @@
-import json
+import asyncio
+import re
+
+import orjson
 
 try:
     from .utils import (
         config,
         create_parsed_record,
+        extract_interview_exp_from_content,
         get_existing_ids,
         has_crossed_till_date,
         jsonl_to_json,
         latest_parsed_date,
         parse_compensation_with_openai,
+        read_jsonl_lines,
+        run_compensation_batch,
         sort_and_truncate,
     )
 except ImportError:
     from utils import (
         config,
         create_parsed_record,
+        extract_interview_exp_from_content,
         get_existing_ids,
         has_crossed_till_date,
         jsonl_to_json,
         latest_parsed_date,
         parse_compensation_with_openai,
+        read_jsonl_lines,
+        run_compensation_batch,
         sort_and_truncate,
     )
 
 
-def parse_posts(input_file: str, output_file: str):
-    """Parse posts from input file and save parsed data to output file."""
+# The content field dominates record size, so pull the id out with a bytes
+# scan and skip decoding posts that are already parsed (the common case on
+# resume runs)
+_ID_RE = re.compile(rb'"id"\s*:\s*(\d+)')
+
+# Boilerplate stripped from post content before it reaches the LLM: embedded
+# images, HTML markup, and runs of whitespace are pure token cost. The tag
+# pattern only matches tag-shaped spans (letter after the <, no newlines), so
+# free-text uses like "<2 YOE" or "20 -> 30 LPA" survive intact
+_IMAGE_MD_RE = re.compile(r"!\[.*?\]\(.*?\)")
+_HTML_TAG_RE = re.compile(r"</?[a-zA-Z][^>\n]*>")
+_WS_RE = re.compile(r"\s+")
+
+
+def build_input_text(raw_post: dict) -> str:
+    """Build the LLM input for a post, stripping cruft and truncating.
+
+    Compensation details sit at the top of a post; anything past the cap is
+    interview-transcript boilerplate that only adds prompt cost. The title is
+    always kept intact. Since the LLM cache key hashes this text, the
+    normalization is part of the key.
+    """
+    content = raw_post["content"]
+    content = _IMAGE_MD_RE.sub("", content)
+    content = _HTML_TAG_RE.sub(" ", content)
+    content = _WS_RE.sub(" ", content).strip()
+
+    max_chars = config["parsing"]["max_content_chars"]
+    if len(content) > max_chars:
+        content = content[:max_chars]
+    return f"{raw_post['title']}\n---\n{content}"
+
+
+def collect_posts_to_parse(input_file: str, output_file: str) -> list[dict]:
+    """Collect posts from the raw file that still need parsing."""
     existing_parsed_ids = get_existing_ids(output_file)
     till_date = latest_parsed_date(output_file)
 
-    parsed_count = 0
-    failed_count = 0
+    posts = []
+    for line in read_jsonl_lines(input_file):
+        if not line.strip():
+            continue
 
-    with open(input_file) as infile, open(output_file, "a") as outfile:
-        for line in infile:
-            if not line.strip():
-                continue
+        match = _ID_RE.search(line)
+        if match and int(match.group(1)) in existing_parsed_ids:
+            continue
 
-            try:
-                raw_post = json.loads(line)
-            except json.JSONDecodeError:
-                continue
+        try:
+            raw_post = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
 
-            post_id = raw_post["id"]
+        if raw_post["id"] in existing_parsed_ids:
+            continue
 
-            if post_id in existing_parsed_ids:
-                continue
+        if has_crossed_till_date(raw_post["creation_date"], till_date):
+            break
 
-            if has_crossed_till_date(raw_post["creation_date"], till_date):
-                break
+        posts.append(raw_post)
 
-            input_text = f"{raw_post['title']}\n---\n{raw_post['content']}"
-            compensation_offers = parse_compensation_with_openai(input_text)
+    return posts
 
-            if compensation_offers and compensation_offers.offers:
-                # Track companies to prevent duplicates within the same post
-                seen_companies = set()
-                valid_offers = []
 
-                for offer in compensation_offers.offers:
-                    company = offer.company.lower() if hasattr(offer, 'company') and offer.company else None
-                    if company and company not in seen_companies:
-                        seen_companies.add(company)
-                        valid_offers.append(offer)
+def write_parsed_post(outfile, raw_post: dict, compensation_offers) -> bool:
+    """Write the offers for one parsed post; return True if anything was written."""
+    post_id = raw_post["id"]
+
+    if not (compensation_offers and compensation_offers.offers):
+        print(f"Failed to parse post {post_id}")
+        return False
+
+    # Track companies to prevent duplicates within the same post
+    seen_companies = set()
+    valid_offers = []
+
+    for offer in compensation_offers.offers:
+        company = offer.company.lower() if hasattr(offer, 'company') and offer.company else None
+        if company and company not in seen_companies:
+            seen_companies.add(company)
+            valid_offers.append(offer)
+
+    if not valid_offers:
+        print(f"No valid offers after deduplication for post {post_id}")
+        return False
+
+    outfile.writelines(
+        orjson.dumps(create_parsed_record(raw_post, offer)) + b"\n"
+        for offer in valid_offers
+    )
+
+    print(
+        f"Parsed post {post_id}: {len(valid_offers)} offers (from {len(compensation_offers.offers)})"
+    )
+    return True
+
+
+async def parse_posts_async(posts: list[dict], output_file: str) -> tuple[int, int]:
+    """Parse posts concurrently, streaming each result out as it completes."""
+    semaphore = asyncio.Semaphore(config["parsing"]["concurrency"])
+    write_lock = asyncio.Lock()
+
+    parsed_count = 0
+    failed_count = 0
+
+    with open(output_file, "ab") as outfile:
 
-                if valid_offers:
-                    for offer in valid_offers:
-                        parsed_record = create_parsed_record(raw_post, offer)
-                        outfile.write(json.dumps(parsed_record) + "\n")
-                        outfile.flush()
+        async def parse_one(raw_post: dict):
+            nonlocal parsed_count, failed_count
 
+            async with semaphore:
+                input_text = build_input_text(raw_post)
+                compensation_offers = await parse_compensation_with_openai(input_text)
+
+            async with write_lock:
+                if write_parsed_post(outfile, raw_post, compensation_offers):
                     parsed_count += 1
-                    print(
-                        f"Parsed post {post_id}: {len(valid_offers)} offers (from {len(compensation_offers.offers)})"
-                    )
                 else:
                     failed_count += 1
-                    print(f"No valid offers after deduplication for post {post_id}")
+
+                if (parsed_count + failed_count) % 32 == 0:
+                    outfile.flush()
+
+        tasks = [asyncio.create_task(parse_one(raw_post)) for raw_post in posts]
+        for task in asyncio.as_completed(tasks):
+            await task
+
+        outfile.flush()
+
+    return parsed_count, failed_count
+
+
+def parse_posts(input_file: str, output_file: str):
+    """Parse posts from input file and save parsed data to output file."""
+    posts = collect_posts_to_parse(input_file, output_file)
+    parsed_count, failed_count = asyncio.run(parse_posts_async(posts, output_file))
+
+    print(f"Parsing complete: {parsed_count} posts parsed, {failed_count} failed")
+    sort_and_truncate(output_file)
+    jsonl_to_json(
+        str(output_file), str(config["app"]["data_dir"] / "parsed_comps.json")
+    )
+
+
+def parse_posts_batch(input_file: str, output_file: str):
+    """Parse posts via the OpenAI Batch API — cheaper for bulk backfill runs."""
+    posts = collect_posts_to_parse(input_file, output_file)
+
+    if not posts:
+        print("No new posts to parse")
+        return
+
+    items = {str(post["id"]): build_input_text(post) for post in posts}
+    results = run_compensation_batch(items)
+
+    parsed_count = 0
+    failed_count = 0
+
+    with open(output_file, "ab") as outfile:
+        for raw_post in posts:
+            custom_id = str(raw_post["id"])
+            compensation_offers = results.get(custom_id)
+
+            if compensation_offers and compensation_offers.offers:
+                interview_exp = extract_interview_exp_from_content(items[custom_id])
+                for offer in compensation_offers.offers:
+                    offer.interview_exp = interview_exp
+
+            if write_parsed_post(outfile, raw_post, compensation_offers):
+                parsed_count += 1
             else:
                 failed_count += 1
-                print(f"Failed to parse post {post_id}")
 
     print(f"Parsing complete: {parsed_count} posts parsed, {failed_count} failed")
     sort_and_truncate(output_file)
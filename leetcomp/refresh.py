@@ -1,9 +1,11 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
 from datetime import datetime
 
 try:
     from .utils import (
+        DATE_FMT,
         LeetCodeFetcher,
         config,
         get_existing_ids,
@@ -14,6 +16,7 @@ try:
     )
 except ImportError:
     from utils import (
+        DATE_FMT,
         LeetCodeFetcher,
         config,
         get_existing_ids,
@@ -23,6 +26,9 @@ except ImportError:
         sort_and_truncate,
     )
 
+MAX_FETCH_WORKERS = 16
+DETAIL_BATCH_SIZE = 10
+
 
 def refresh_posts(output_file: str, max_posts: int = 100):
     """Refresh posts from LeetCode and save to file."""
@@ -36,13 +42,24 @@ def refresh_posts(output_file: str, max_posts: int = 100):
     skipped_due_to_lag = 0
     should_stop = False
 
-    with open(output_file, "a") as f:
+    with open(output_file, "a") as f, ThreadPoolExecutor(
+        max_workers=MAX_FETCH_WORKERS
+    ) as executor:
+        # Double-buffer the page listing: the next page downloads while the
+        # current one is filtered and its details fetched. Fetching all pages
+        # up front would defeat the till_date/max_posts early stop; prefetching
+        # one ahead overlaps the latency and wastes at most one request
+        next_page = executor.submit(fetcher.fetch_posts_list, skip, first)
         while new_posts_count < max_posts and not should_stop:
-            posts_list = fetcher.fetch_posts_list(skip, first)
+            posts_list = next_page.result()
 
             if not posts_list:
                 break
 
+            next_page = executor.submit(fetcher.fetch_posts_list, skip + first, first)
+
+            # Filter the page by date/id first so only survivors hit the API
+            topic_ids_to_fetch = []
             for post_edge in posts_list:
                 node = post_edge["node"]
                 topic_id = node["topicId"]
@@ -50,12 +67,10 @@ def refresh_posts(output_file: str, max_posts: int = 100):
                 if topic_id in existing_ids:
                     continue
 
-                # Parse creation date from the posts list (no need to fetch details)
-                creation_date_iso = node["createdAt"]
-                creation_date = datetime.fromisoformat(
-                    creation_date_iso.replace("Z", "+00:00")
-                )
-                formatted_date = creation_date.strftime(config["app"]["date_fmt"])
+                # Parse creation date from the posts list (no need to fetch
+                # details); fromisoformat accepts the trailing Z on 3.11+
+                creation_date = datetime.fromisoformat(node["createdAt"])
+                formatted_date = creation_date.strftime(DATE_FMT)
 
                 # Check date conditions early before fetching post details
                 if has_crossed_till_date(formatted_date, till_date):
@@ -67,11 +82,29 @@ def refresh_posts(output_file: str, max_posts: int = 100):
                     skipped_due_to_lag += 1
                     continue
 
+                topic_ids_to_fetch.append(topic_id)
+
+            # One aliased query covers a whole batch of detail fetches, and
+            # the page's batches run concurrently, so a page costs roughly one
+            # round trip of latency; results are drained in original order so
+            # the stop condition stays deterministic
+            batches = [
+                topic_ids_to_fetch[i : i + DETAIL_BATCH_SIZE]
+                for i in range(0, len(topic_ids_to_fetch), DETAIL_BATCH_SIZE)
+            ]
+            futures = [
+                executor.submit(fetcher.fetch_post_details_batch, batch)
+                for batch in batches
+            ]
+            details = {}
+            for future in futures:
+                details.update(future.result())
+
+            for topic_id in topic_ids_to_fetch:
                 try:
-                    # Only fetch details if we passed the date filters
-                    post_details = fetcher.fetch_post_details(topic_id)
+                    post_details = details.get(topic_id)
                     if post_details is None:
-                       continue
+                        continue
                     post = fetcher.parse_post_data(post_details)
 
                     if fetcher.should_parse_post(post):
@@ -95,6 +128,7 @@ def refresh_posts(output_file: str, max_posts: int = 100):
 
             skip += first
 
+    fetcher.close()
     print(f"Fetched {new_posts_count} new posts")
     if skipped_due_to_lag > 0:
         print(f"Skipped {skipped_due_to_lag} posts due to lag period")
@@ -11,26 +11,49 @@ from .data_processing import (
     mapped_record,
 )
 from .helpers import (
+    DATE_FMT,
+    aretry_with_exp_backoff,
     latest_parsed_date,
+    parse_date,
+    read_jsonl_lines,
     retry_with_exp_backoff,
     sort_and_truncate,
     truncate_raw_posts,
 )
-from .leetcode_api import (
-    CompensationOffer,
-    CompensationOffers,
-    LeetCodeFetcher,
-    LeetCodePost,
-    is_within_lag_period,
-    parse_compensation_with_openai,
-)
+
+# LeetCode API names are re-exported lazily (PEP 562): importing them pulls in
+# gql/openai/pydantic, which costs seconds that config/file-helper-only entry
+# points shouldn't pay
+_LEETCODE_API_EXPORTS = {
+    "CompensationOffer",
+    "CompensationOffers",
+    "LeetCodeFetcher",
+    "LeetCodePost",
+    "extract_interview_exp_from_content",
+    "is_within_lag_period",
+    "parse_compensation_with_openai",
+    "run_compensation_batch",
+}
+
+
+def __getattr__(name):
+    if name in _LEETCODE_API_EXPORTS:
+        from . import leetcode_api
+
+        return getattr(leetcode_api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     # Config
     "config",
     # Helpers
+    "DATE_FMT",
     "retry_with_exp_backoff",
+    "aretry_with_exp_backoff",
     "latest_parsed_date",
+    "parse_date",
+    "read_jsonl_lines",
     "sort_and_truncate",
     "truncate_raw_posts",
     # Data processing
@@ -48,6 +71,8 @@ __all__ = [
     "CompensationOffer",
     "CompensationOffers",
     "LeetCodeFetcher",
+    "extract_interview_exp_from_content",
     "is_within_lag_period",
     "parse_compensation_with_openai",
+    "run_compensation_batch",
 ]
@@ -1,27 +1,73 @@
-import json
+import bisect
+import functools
 import os
 import re
+import string
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from .config import config
+from .helpers import parse_date, read_jsonl_lines
+
+# Records are machine-written with a known schema, so the id can be pulled out
+# with a byte-level scan instead of decoding every field on every line.
+_ID_RE = re.compile(rb'"id"\s*:\s*(\d+)')
+
+# Deletion table stripping punctuation/whitespace from roles; a single
+# C-level pass versus regex findall + join. Includes the unicode dashes and
+# quotes that show up in post titles.
+_ROLE_CLEANUP_TABLE = str.maketrans(
+    "", "", string.punctuation + string.whitespace + "–—‐‑’‘“”•·"
+)
+
+# Roles matched by substring before the mapping lookup
+_ROLE_EXTRAS = ["analyst", "intern", "associate"]
 
+# Multi-location separators, split in one scan
+_SEP_RE = re.compile(r"[,/]")
 
-def get_existing_ids(filepath: str) -> set[str]:
-    """Get set of existing IDs from a JSONL file."""
+
+def get_existing_ids(filepath: str) -> set[int]:
+    """Get set of existing IDs from a JSONL file.
+
+    Keeps a newline-delimited ``.ids`` sidecar next to the JSONL so repeat
+    invocations skip rescanning the whole file; the sidecar is rebuilt
+    whenever the JSONL is newer.
+    """
     if not os.path.exists(filepath):
         return set()
 
+    sidecar = filepath + ".ids"
+    try:
+        if os.path.getmtime(sidecar) >= os.path.getmtime(filepath):
+            with open(sidecar) as f:
+                return set(map(int, f.read().split()))
+    except (OSError, ValueError):
+        pass
+
     existing_ids = set()
-    with open(filepath) as f:
+    with open(filepath, "rb") as f:
         for line in f:
-            if line.strip():
-                try:
-                    data = json.loads(line)
-                    existing_ids.add(data["id"])
-                except json.JSONDecodeError:
-                    continue
+            if not line.strip():
+                continue
+            match = _ID_RE.search(line)
+            if match:
+                existing_ids.add(int(match.group(1)))
+                continue
+            try:
+                existing_ids.add(orjson.loads(line)["id"])
+            except (orjson.JSONDecodeError, KeyError):
+                continue
+
+    try:
+        with open(sidecar, "w") as f:
+            f.write("\n".join(map(str, existing_ids)))
+    except OSError:
+        pass
+
     return existing_ids
 
 
@@ -29,23 +75,32 @@ def has_crossed_till_date(creation_date: str, till_date: datetime | None) -> boo
     """Check if creation date is before or equal to till_date."""
     if till_date is None:
         return False
-    dt = datetime.strptime(creation_date, config["app"]["date_fmt"])
-    return dt <= till_date
+    return parse_date(creation_date) <= till_date
 
 
-def cleanup_record(record: dict[Any, Any]) -> None:
-    """Clean up a record by removing unnecessary fields and formatting data."""
-    record.pop("vote_count", None)
-    record.pop("comment_count", None)
-    record.pop("view_count", None)
+def cleanup_record(record: dict[Any, Any]) -> dict[str, Any]:
+    """Build the cleaned-up output record in a single pass.
 
-    record["creation_date"] = record["creation_date"][:10]
-    record["yoe"] = round(record["yoe"])
-    record["base"] = round(float(record["base_offer"]), 2)
-    record["total"] = round(float(record["total_offer"]), 2)
+    Constructing the dict directly is cheaper than mutating the input with a
+    series of pops, and pins the output key order in one place.
+    """
+    return {
+        "id": record["id"],
+        "creation_date": record["creation_date"][:10],
+        "company": record["company"],
+        "role": record["role"],
+        "yoe": round(record["yoe"]),
+        "location": record["location"],
+        "interview_exp": record["interview_exp"],
+        "base": round(float(record["base_offer"]), 2),
+        "total": round(float(record["total_offer"]), 2),
+    }
 
-    record.pop("base_offer", None)
-    record.pop("total_offer", None)
+
+@functools.lru_cache(maxsize=4096)
+def _capitalize(item: str) -> str:
+    """Memoized str.capitalize — unmapped tokens repeat heavily across records."""
+    return item.capitalize()
 
 
 def mapped_record(
@@ -59,9 +114,12 @@ def mapped_record(
     if extras:
         for role_str in extras:
             if role_str in item:
-                return role_str.capitalize()
+                return _capitalize(role_str)
 
-    return mapping.get(item, default or item.capitalize())
+    mapped = mapping.get(item)
+    if mapped is not None:
+        return mapped
+    return default or _capitalize(item)
 
 
 def map_location(location: str, location_map: dict[str, str]) -> str:
@@ -72,39 +130,53 @@ def map_location(location: str, location_map: dict[str, str]) -> str:
         return location_map[location]
 
     if "(" in location:
-        location = location.split("(")[0].strip()
+        location = location.split("(", 1)[0].strip()
 
-    for sep in [",", "/"]:
-        if sep in location:
-            locations = [loc.strip().lower() for loc in location.split(sep)]
-            location = "/".join(
-                [location_map.get(loc, loc.capitalize()) for loc in locations]
-            )
-            return location
+    parts = _SEP_RE.split(location)
+    if len(parts) > 1:
+        return "/".join(
+            location_map.get(loc) or _capitalize(loc)
+            for loc in (part.strip() for part in parts)
+        )
 
-    return location_map.get(location, location.capitalize())
+    return location_map.get(location) or _capitalize(location)
 
 
-def map_yoe(yoe: int, yoe_map: dict[tuple[int, int], str]) -> str:
-    """Map years of experience to a category."""
-    for (start, end), mapped_yoe in yoe_map.items():
-        if start <= yoe <= end:
-            return mapped_yoe
+# Upper bound of each experience bucket; bisect picks the label
+_YOE_BOUNDS = (1, 6, 10, 30)
+_YOE_LABELS = (
+    "Entry (0-1)",
+    "Mid (2-6)",
+    "Senior (7-10)",
+    "Senior + (11+)",
+    "Senior +",
+)
 
-    return "Senior +"
 
+def map_yoe(yoe: int) -> str:
+    """Map years of experience to a category."""
+    return _YOE_LABELS[bisect.bisect_left(_YOE_BOUNDS, max(int(yoe), 0))]
 
+
+@functools.cache
 def load_mapping(map_path: str | Path) -> dict[str, str]:
-    """Load mapping dictionary from JSON file."""
+    """Load mapping dictionary from JSON file.
+
+    Cached per path — the mapping files never change mid-run, and
+    jsonl_to_json runs for both parse paths in one process.
+    """
     try:
-        with open(map_path) as f:
-            data = json.load(f)
+        with open(map_path, "rb") as f:
+            data = orjson.loads(f.read())
 
-        mapping_dict = {}
+        mapping_dict: dict[str, str] = {}
         for d in data:
             if "cluster" in d and "cluster_name" in d:
-                for item in d["cluster"]:
-                    mapping_dict[item] = d["cluster_name"]
+                # Bulk-insert each cluster in one C-level update; keys are
+                # lowercased so lookups never miss on case
+                mapping_dict.update(
+                    dict.fromkeys(map(str.lower, d["cluster"]), d["cluster_name"])
+                )
             else:
                 print(f"Warning: Invalid mapping entry: {d}")
 
@@ -122,42 +194,38 @@ def jsonl_to_json(jsonl_path: str, json_path: str) -> None:
     role_map = load_mapping(config["app"]["data_dir"] / "role_map.json")
     location_map = load_mapping(config["app"]["data_dir"] / "location_map.json")
 
-    # YOE mapping
-    yoe_map: dict[tuple[int, int], str] = {
-        (0, 1): "Entry (0-1)",
-        (2, 6): "Mid (2-6)",
-        (7, 10): "Senior (7-10)",
-        (11, 30): "Senior + (11+)",
-    }
-
-    records = []
-
-    with open(jsonl_path) as file:
-        for line in file:
+    # Stream line by line on the way in and write records straight to the
+    # output file on the way out — neither side ever holds the whole corpus,
+    # so memory stays flat as the parsed file grows
+    count = 0
+    with open(json_path, "wb") as outfile:
+        outfile.write(b"[\n")
+        for line in read_jsonl_lines(jsonl_path):
             if not line.strip():
                 continue
 
             try:
-                record = json.loads(line)
-                cleanup_record(record)
+                record = cleanup_record(orjson.loads(line))
                 record["company"] = mapped_record(record["company"], company_map)
-                role_to_map = "".join(re.findall(r"\w+", record["role"]))
+                role_to_map = record["role"].translate(_ROLE_CLEANUP_TABLE)
                 record["mapped_role"] = mapped_record(
                     role_to_map,
                     role_map,
                     default=record["role"],
-                    extras=["analyst", "intern", "associate"],
+                    extras=_ROLE_EXTRAS,
                 )
-                record["mapped_yoe"] = map_yoe(record["yoe"], yoe_map)
+                record["mapped_yoe"] = map_yoe(record["yoe"])
                 record["location"] = map_location(record["location"], location_map)
-                records.append(record)
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 continue
 
-    with open(json_path, "w") as file:
-        json.dump(records, file, indent=4)
+            if count:
+                outfile.write(b",\n")
+            outfile.write(orjson.dumps(record, option=orjson.OPT_INDENT_2))
+            count += 1
+        outfile.write(b"\n]")
 
-    print(f"Converted {len(records)} records!")
+    print(f"Converted {count} records!")
 
 
 def create_parsed_record(raw_post: dict, offer: Any) -> dict:
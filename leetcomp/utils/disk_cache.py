@@ -0,0 +1,42 @@
+import os
+import time
+from pathlib import Path
+
+# One file per key, payloads are small JSON strings. Lives outside the
+# committed data dir so cache entries never end up in the dataset.
+_CACHE_ROOT = Path(__file__).parent.parent / ".cache"
+
+
+def _cache_dir(namespace: str) -> Path:
+    path = _CACHE_ROOT / namespace
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cache_get(namespace: str, key: str, max_age_days: float | None = None) -> str | None:
+    """Return the cached payload for key, or None if missing or expired."""
+    path = _cache_dir(namespace) / key
+    if not path.exists():
+        return None
+
+    if max_age_days is not None:
+        age_seconds = time.time() - path.stat().st_mtime
+        if age_seconds > max_age_days * 86400:
+            return None
+
+    return path.read_text()
+
+
+def cache_set(namespace: str, key: str, payload: str) -> None:
+    """Store payload under key."""
+    # Write to a sibling temp file and swap it in, so an interrupted run
+    # never leaves a partial entry for later runs to trip over
+    path = _cache_dir(namespace) / key
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(payload)
+    os.replace(tmp, path)
+
+
+def cache_delete(namespace: str, key: str) -> None:
+    """Drop the entry for key if present."""
+    (_cache_dir(namespace) / key).unlink(missing_ok=True)
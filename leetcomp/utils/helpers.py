@@ -1,15 +1,52 @@
-import json
+import asyncio
+import heapq
+import os
 import random
 import time
 from collections.abc import Callable
 from datetime import datetime
 from functools import wraps
+from operator import itemgetter
 from pathlib import Path
 
+import orjson
+
 from .config import config
 
+DATE_FMT = config["app"]["date_fmt"]
+
+# fromisoformat is C-implemented and handles the default format directly;
+# strptime re-runs its pure-python format machinery on every call
+_DATE_FMT_IS_ISO = DATE_FMT == "%Y-%m-%d %H:%M:%S"
+
+
+def parse_date(date_str: str) -> datetime:
+    """Parse a creation-date string using the configured format."""
+    if _DATE_FMT_IS_ISO:
+        return datetime.fromisoformat(date_str)
+    return datetime.strptime(date_str, DATE_FMT)
+
+
+def date_sort_key(date_str: str) -> str | datetime:
+    """Sort key for a creation-date string.
+
+    The default format is fixed-width ISO, so lexicographic order equals
+    chronological order and the string itself can be the key — no parsing at
+    all. Non-ISO formats fall back to parsing.
+    """
+    if _DATE_FMT_IS_ISO:
+        return date_str
+    return parse_date(date_str)
+
+
+def _backoff_bounds(retries: int) -> tuple[tuple[float, float], ...]:
+    """Precompute the (low, high) sleep window for each retry attempt."""
+    return tuple((float(2**i), float(2 ** (i + 1))) for i in range(1, retries + 1))
+
 
 def retry_with_exp_backoff(retries: int):
+    bounds = _backoff_bounds(retries)
+
     def decorator(function: Callable):
         @wraps(function)
         def wrapper(*args, **kwargs):
@@ -18,7 +55,8 @@ def retry_with_exp_backoff(retries: int):
                 try:
                     return function(*args, **kwargs)
                 except Exception as e:
-                    sleep_for = random.uniform(2**i, 2 ** (i + 1))
+                    lo, hi = bounds[i - 1]
+                    sleep_for = lo + (hi - lo) * random.random()
                     err_msg = f"{function.__name__} ({args}, {kwargs}): {e}"
                     print(f"Retry={i} Rest={sleep_for:.1f}s Err={err_msg}")
                     time.sleep(sleep_for)
@@ -31,65 +69,157 @@ def retry_with_exp_backoff(retries: int):
     return decorator
 
 
-def latest_parsed_date(file_path: str) -> datetime | None:
-    if not Path(file_path).exists():
-        return None
+def aretry_with_exp_backoff(retries: int):
+    """Async twin of retry_with_exp_backoff; sleeps without blocking the loop."""
+    bounds = _backoff_bounds(retries)
+
+    def decorator(function: Callable):
+        @wraps(function)
+        async def wrapper(*args, **kwargs):
+            i = 1
+            while i <= retries:
+                try:
+                    return await function(*args, **kwargs)
+                except Exception as e:
+                    lo, hi = bounds[i - 1]
+                    sleep_for = lo + (hi - lo) * random.random()
+                    err_msg = f"{function.__name__} ({args}, {kwargs}): {e}"
+                    print(f"Retry={i} Rest={sleep_for:.1f}s Err={err_msg}")
+                    await asyncio.sleep(sleep_for)
+                    i += 1
+                    if i > retries:
+                        raise
+
+        return wrapper
 
-    with open(file_path) as f:
-        lines = f.readlines()
+    return decorator
+
+
+def read_jsonl_lines(file_path: str, block_size: int = 1 << 20):
+    """Yield raw JSONL lines as bytes, reading the file in large binary blocks.
+
+    Avoids the per-line text decoding of plain file iteration; callers pass the
+    bytes straight to orjson.
+    """
+    with open(file_path, "rb") as f:
+        tail = b""
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            lines = (tail + block).split(b"\n")
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
 
-    if not lines:
+
+def latest_parsed_date(file_path: str) -> datetime | None:
+    if not Path(file_path).exists():
         return None
 
-    for line in lines:
+    # Only the first valid record is needed, so read a small prefix instead
+    # of the whole file; fall back to a full scan if the head has no hit
+    with open(file_path, "rb") as f:
+        head = f.read(65536)
+        lines = head.splitlines()
+        if len(head) == 65536:
+            lines = lines[:-1]  # last line may be cut mid-record
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = orjson.loads(line)
+                if "creation_date" in record:
+                    return parse_date(record["creation_date"])
+            except orjson.JSONDecodeError:
+                continue
+
+    for line in read_jsonl_lines(file_path):
         line = line.strip()
         if not line:
             continue
         try:
-            record = json.loads(line)
+            record = orjson.loads(line)
             if "creation_date" in record:
-                return datetime.strptime(
-                    record["creation_date"], config["app"]["date_fmt"]
-                )
-        except json.JSONDecodeError:
+                return parse_date(record["creation_date"])
+        except orjson.JSONDecodeError:
             continue
 
     return None
 
 
+def _compact_jsonl(file_path: str, max_recs: int) -> tuple[int, int, bool]:
+    """Single-pass core behind sort_and_truncate and truncate_raw_posts.
+
+    Streams the file once, keys each raw line by creation date, and rewrites
+    the newest ``max_recs`` lines newest-first. Returns (total records found,
+    records kept, whether the file was rewritten); an already-sorted file
+    within bounds is left untouched.
+    """
+    # Keep (sort key, raw line) pairs so each record is keyed once and never
+    # re-serialized on write
+    keyed_lines: list[tuple[str | datetime, bytes]] = []
+    already_sorted = True
+    prev_date: str | datetime | None = None
+    for line in read_jsonl_lines(file_path):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
+        if "creation_date" in record:
+            date = date_sort_key(record["creation_date"])
+            keyed_lines.append((date, line))
+            if prev_date is not None and date > prev_date:
+                already_sorted = False
+            prev_date = date
+
+    total = len(keyed_lines)
+    if not total:
+        return 0, 0, False
+
+    # New posts land roughly newest-first, so the file is often already in
+    # order and within bounds — skip the full rewrite in that case
+    if already_sorted and total <= max_recs:
+        return total, total, False
+
+    if total > max_recs:
+        # O(N log K) bounded selection instead of a full O(N log N) sort when
+        # most records will be dropped anyway; nlargest returns newest-first
+        keyed_lines = heapq.nlargest(max_recs, keyed_lines, key=itemgetter(0))
+    else:
+        keyed_lines.sort(key=itemgetter(0), reverse=True)
+
+    # Write to a temp file and swap it in so a crash mid-write cannot
+    # truncate the dataset
+    temp_file = f"{file_path}.tmp"
+    with open(temp_file, "wb") as f:
+        f.write(b"\n".join(line for _, line in keyed_lines) + b"\n")
+    os.replace(temp_file, file_path)
+
+    return total, len(keyed_lines), True
+
+
 def sort_and_truncate(file_path: str):
     if not Path(file_path).exists():
         return
 
-    records = []
-    with open(file_path) as f:
-        for line in f:
-            if line.strip():
-                try:
-                    record = json.loads(line)
-                    if "creation_date" in record:
-                        records.append(record)
-                except json.JSONDecodeError:
-                    continue
-
-    if not records:
+    total, kept, rewritten = _compact_jsonl(file_path, config["app"]["max_recs"])
+    if not total:
         return
 
-    records.sort(
-        key=lambda x: datetime.strptime(x["creation_date"], config["app"]["date_fmt"]),
-        reverse=True,
-    )
-
-    max_records = config["app"]["max_recs"]
-    if len(records) > max_records:
-        records = records[:max_records]
-        print(f"Truncated to {max_records} records")
-
-    with open(file_path, "w") as f:
-        for record in records:
-            f.write(json.dumps(record) + "\n")
+    if not rewritten:
+        print(f"{total} records already sorted")
+        return
 
-    print(f"Sorted {len(records)} records")
+    if kept < total:
+        print(f"Truncated to {kept} records")
+    print(f"Sorted {kept} records")
 
 
 def truncate_raw_posts(file_path: str, keep_count: int = 100):
@@ -98,47 +228,19 @@ def truncate_raw_posts(file_path: str, keep_count: int = 100):
         print(f"File {file_path} does not exist")
         return
 
-    records = []
-    with open(file_path) as f:
-        for line in f:
-            if line.strip():
-                try:
-                    record = json.loads(line)
-                    if "creation_date" in record:
-                        records.append(record)
-                except json.JSONDecodeError:
-                    continue
-
-    if not records:
+    total, kept, _ = _compact_jsonl(file_path, keep_count)
+    if not total:
         print(f"No valid records found in {file_path}")
         return
 
-    # Sort by creation date (newest first)
-    records.sort(
-        key=lambda x: datetime.strptime(x["creation_date"], config["app"]["date_fmt"]),
-        reverse=True,
-    )
-
-    original_count = len(records)
-
-    # Keep only the latest records
-    if len(records) > keep_count:
-        records = records[:keep_count]
-        removed_count = original_count - len(records)
-
-        # Write back to file
-        with open(file_path, "w") as f:
-            for record in records:
-                f.write(json.dumps(record) + "\n")
-
+    if kept < total:
         msg = (
-            f"Truncated raw posts: kept {len(records)} latest records, "
-            f"removed {removed_count} older records"
+            f"Truncated raw posts: kept {kept} latest records, "
+            f"removed {total - kept} older records"
         )
-        print(msg)
     else:
         msg = (
-            f"Raw posts file has {len(records)} records (≤ {keep_count}), "
+            f"Raw posts file has {kept} records (≤ {keep_count}), "
             "no truncation needed"
         )
-        print(msg)
+    print(msg)